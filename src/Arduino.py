@@ -1,94 +1,298 @@
+import os
+import json
 import pyfirmata
 import serial.tools.list_ports
+import threading
+import time
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 logger = logging.getLogger(__name__)
 
+# Port enumeration can be slow (e.g. with Bluetooth serial ports on Windows),
+# so results are reused for a short time across detection attempts
+_PORTS_CACHE = {'time': 0.0, 'ports': None}
+_PORTS_CACHE_LOCK = threading.Lock()
+
+def _cached_comports(ttl=2.0):
+    """
+    Return the list of serial ports, re-enumerating at most once per ttl seconds.
+
+    Args:
+        ttl (float): Time in seconds a previous enumeration stays valid.
+
+    Returns:
+        list of ListPortInfo: The available serial ports.
+    """
+    with _PORTS_CACHE_LOCK:
+        now = time.monotonic()
+        if _PORTS_CACHE['ports'] is None or now - _PORTS_CACHE['time'] >= ttl:
+            _PORTS_CACHE['ports'] = list(serial.tools.list_ports.comports())
+            _PORTS_CACHE['time'] = now
+        return list(_PORTS_CACHE['ports'])
+
+# Known Arduino VID/PID pairs. Extend arduino_vid_pid.json, or set
+# ARDUINO_VID_PID_EXTRA to a comma-separated list such as "2341:0043,1A86:7523".
+VID_PID_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'arduino_vid_pid.json')
+
+def _load_vid_pid_db(path=VID_PID_DB_PATH):
+    """
+    Load the known Arduino VID/PID pairs, plus any given in ARDUINO_VID_PID_EXTRA.
+
+    Args:
+        path (str): Path of the JSON file listing {"vid", "pid", "description"} entries.
+
+    Returns:
+        frozenset of tuple: (vid, pid) integer pairs.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+    pairs = {(int(entry['vid'], 16), int(entry['pid'], 16)) for entry in entries}
+
+    for item in os.environ.get('ARDUINO_VID_PID_EXTRA', '').split(','):
+        if not item.strip():
+            continue
+        try:
+            vid, pid = item.split(':')
+            pairs.add((int(vid, 16), int(pid, 16)))
+        except ValueError:
+            logger.warning(f"Ignoring invalid ARDUINO_VID_PID_EXTRA entry: {item!r}")
+    return frozenset(pairs)
+
+_VID_PID_DB = _load_vid_pid_db()
+
+# Port of the last auto-detected board that connected successfully
+_DETECTED_PORT = None
+
+def invalidate_port_cache():
+    """
+    Forget the cached serial ports and auto-detected Arduino port,
+    e.g. after the board was reconnected to a different USB port.
+    """
+    global _DETECTED_PORT
+    _DETECTED_PORT = None
+    with _PORTS_CACHE_LOCK:
+        _PORTS_CACHE['ports'] = None
+
+class _SharedBoard:
+    """
+    A Firmata board connection and its iterator thread, shared by all
+    ArduinoController instances that use the same port.
+    """
+
+    def __init__(self, port):
+        """
+        Connect to the board and start its iterator thread.
+
+        Args:
+            port (str): COM port or device file of the board.
+        """
+        self.port = port
+        self.controllers = []
+        self.board = pyfirmata.Arduino(port)
+        # Detect edges as digital messages are parsed by the iterator thread
+        self.board.add_cmd_handler(pyfirmata.DIGITAL_MESSAGE, self._handle_digital_message)
+        self.it = pyfirmata.util.Iterator(self.board)
+        self.it.start()
+
+    def _handle_digital_message(self, port_nr, lsb, msb):
+        """
+        Firmata DIGITAL_MESSAGE handler, called on the pyfirmata iterator thread.
+        Updates the pin values as pyfirmata does, then lets every controller
+        on this board flag the edges of its input pins.
+
+        Args:
+            port_nr (int): The digital port number (8 pins per port).
+            lsb (int): Lower 7 bits of the port state.
+            msb (int): Upper bit of the port state.
+        """
+        mask = (msb << 7) + lsb
+        try:
+            self.board.digital_ports[port_nr]._update(mask)
+        except IndexError:
+            logger.warning(f"Digital message for unknown port {port_nr}.")
+            return
+        # Copy the list, as controllers may attach while the iterator thread runs
+        for controller in list(self.controllers):
+            controller._detect_edges(port_nr, mask)
+
+# Open board connections by port. pyfirmata cannot open one port twice, and
+# each connection runs its own serial reader thread.
+_BOARD_POOL = {}
+_BOARD_POOL_LOCK = threading.Lock()
+
+def _acquire_board(port, controller):
+    """
+    Attach a controller to the shared connection of a port, connecting if needed.
+
+    Returns:
+        tuple: The _SharedBoard, and True if the connection was newly opened.
+    """
+    with _BOARD_POOL_LOCK:
+        shared = _BOARD_POOL.get(port)
+        created = shared is None
+        if created:
+            shared = _SharedBoard(port)
+            _BOARD_POOL[port] = shared
+        shared.controllers.append(controller)
+        return shared, created
+
+def _release_board(shared, controller):
+    """
+    Detach a controller from a shared connection, closing it when no controller is left.
+
+    Returns:
+        bool: True if the connection was closed.
+    """
+    with _BOARD_POOL_LOCK:
+        if controller in shared.controllers:
+            shared.controllers.remove(controller)
+        if shared.controllers:
+            return False
+        _BOARD_POOL.pop(shared.port, None)
+    shared.board.exit()
+    return True
+
 class ArduinoController:
     """
     A controller class for Arduino boards, using the pyFirmata library.
     Enhanced to detect Arduino devices based on VID/PID.
     """
 
-    # Define known Arduino VID and PID tuples
-    ARDUINO_VID_PID = [
-    ('2341', '0043'),  # Official Arduino Uno
-    ('2341', '0001'),  # Official Arduino Uno (Old)
-    ('2A03', '0043'),  # Arduino Uno R3 (later versions)
-    ('2341', '0243'),  # Arduino Mega 2560 R3
-    ('2A03', '0044'),  # Arduino Mega 2560 R3 (later versions)
-    ('2341', '8036'),  # Arduino Leonardo
-    ('2A03', '8036'),  # Arduino Leonardo (later versions)
-    ('2341', '8037'),  # Arduino Micro
-    ('2A03', '8037'),  # Arduino Micro (later versions)
-    ('2341', '824E'),  # Arduino Zero (Programming Port)
-    ('2341', '814E'),  # Arduino Zero (Native USB Port)
-    ('1A86', '7523'),  # CH340-Based Clones
-    ('1A86', '5523'),  # CH341-Based Clones (alternate PID)
-    ('0403', '6001'),  # FTDI FT232R-Based Clones
-    ('067B', '2303'),  # Prolific PL2303-Based Clones
-    ('10C4', 'EA60'),  # Silicon Labs CP2102-Based Clones
-    ('10C4', 'EA70'),  # Silicon Labs CP2102N-Based Clones
-    ('10C4', 'EA61'),  # Silicon Labs CP2104-Based Clones
-    ('10C4', 'EA62'),  # Silicon Labs CP2104-Based Clones
-    ('16C0', '0483'),  # Teensyduino (Teensy 2.0)
-    ('16C0', '0485'),  # Teensyduino (Teensy 3.x and 4.x)
-    # Add more VID/PID tuples for newer boards and variants as needed
-]
-
-    def __init__(self, port=None):
+    # Known Arduino (VID, PID) pairs, loaded from arduino_vid_pid.json
+    ARDUINO_VID_PID = _VID_PID_DB
+
+    __slots__ = (
+        'board', 'it', '_shared', 'input_pins', 'output_pins', '_pin_readers', '_pin_writers',
+        'prev_states', 'port_states', 'rising_edge_events', 'falling_edge_events'
+    )
+
+    def __init__(self, port=None, early_exit=True):
         """
         Initialize the connection to the Arduino board using the specified port.
+        Controllers created for the same port share one connection.
 
         Args:
             port (str or None): COM port or device file for Arduino. If None, auto-detect.
+            early_exit (bool): When auto-detecting, use the first matching port instead
+                of scanning all ports and prompting if several Arduinos are connected.
         """
+        global _DETECTED_PORT
         self.board = None
+        self.it = None
+        self._shared = None
         self.input_pins = {}
         self.output_pins = {}
+        # Bound pin read/write methods, so the hot paths skip the attribute lookup
+        self._pin_readers = {}
+        self._pin_writers = {}
         self.prev_states = {}
+        self.port_states = {}
+        self.rising_edge_events = {}
+        self.falling_edge_events = {}
 
-        if port is None:
-            port = self.auto_detect_arduino_port()
+        auto_detected = port is None
+        if auto_detected:
+            port = self.auto_detect_arduino_port(early_exit=early_exit)
 
         if port:
             try:
-                self.board = pyfirmata.Arduino(port)
-                self.it = pyfirmata.util.Iterator(self.board)
-                self.it.start()
-                logger.info(f"Connected to Arduino on port {port}")
+                self._shared, created = _acquire_board(port, self)
+                self.board = self._shared.board
+                self.it = self._shared.it
+                if auto_detected:
+                    _DETECTED_PORT = port
+                if created:
+                    self.enable_low_latency(port)
+                    logger.info(f"Connected to Arduino on port {port}")
+                else:
+                    logger.info(f"Sharing existing Arduino connection on port {port}")
             except Exception as e:
                 logger.error(f"Failed to connect to Arduino on port {port}: {e}")
+                if auto_detected:
+                    invalidate_port_cache()
         else:
             logger.error("No Arduino port provided or detected. Board is not connected.")
 
-    def auto_detect_arduino_port(self):
+    def enable_low_latency(self, port=None):
+        """
+        Ask the serial driver to deliver received bytes immediately instead of
+        batching them (e.g. the 16 ms latency timer of FTDI adapters).
+        Only supported on Linux; other platforms keep the driver default.
+
+        If the driver rejects the low latency flag, the USB serial latency timer
+        is lowered through sysfs instead. Without write access to sysfs, run
+        `setserial <port> low_latency` as root.
+
+        Args:
+            port (str or None): Device path of the board, used for the sysfs fallback.
+        """
+        serial_port = getattr(self.board, 'sp', None)
+        if not hasattr(serial_port, 'set_low_latency_mode'):
+            return
+        try:
+            serial_port.set_low_latency_mode(True)
+            logger.info("Enabled low latency mode on the serial port.")
+        except Exception as e:
+            if port and self._set_latency_timer(port):
+                logger.info("Set the USB serial latency timer to 1 ms.")
+            else:
+                logger.warning(f"Failed to enable low latency mode on the serial port: {e}")
+
+    @staticmethod
+    def _set_latency_timer(port, latency_ms=1):
+        """
+        Write the latency timer of a Linux USB serial adapter through sysfs.
+
+        Args:
+            port (str): Device path, e.g. '/dev/ttyUSB0'.
+            latency_ms (int): Latency timer value in milliseconds.
+
+        Returns:
+            bool: True if the latency timer was written.
+        """
+        name = os.path.basename(os.path.realpath(port))
+        path = f"/sys/bus/usb-serial/devices/{name}/latency_timer"
+        try:
+            with open(path, 'w') as f:
+                f.write(str(latency_ms))
+            return True
+        except OSError:
+            return False
+
+    def auto_detect_arduino_port(self, early_exit=True):
         """
         Auto-detect the Arduino COM port by scanning available ports
         and matching known VID/PID pairs.
 
+        Args:
+            early_exit (bool): Return the first matching port instead of checking
+                all ports and prompting when several Arduinos are connected.
+
         Returns:
             str or None: The detected port name, or None if not found.
         """
-        ports = list(serial.tools.list_ports.comports())
+        if _DETECTED_PORT is not None:
+            logger.info(f"Using previously detected Arduino port: {_DETECTED_PORT}")
+            return _DETECTED_PORT
+
+        ports = _cached_comports()
         arduino_ports = []
 
         for port_info in ports:
-            # Extract VID and PID in hexadecimal
+            # Extract VID and PID as integers
             vid = port_info.vid
             pid = port_info.pid
 
             if vid is None or pid is None:
                 continue  # Skip ports without VID/PID
 
-            # Convert to hexadecimal string without '0x' and leading zeros
-            vid_hex = format(vid, '04X')
-            pid_hex = format(pid, '04X')
-
             # Check if VID/PID matches known Arduino devices
-            if (vid_hex, pid_hex) in self.ARDUINO_VID_PID:
+            if (vid, pid) in self.ARDUINO_VID_PID:
                 arduino_ports.append(port_info.device)
-                logger.info(f"Detected Arduino on port: {port_info.device} (VID: {vid_hex}, PID: {pid_hex})")
+                logger.info(f"Detected Arduino on port: {port_info.device} (VID: {vid:04X}, PID: {pid:04X})")
+                if early_exit:
+                    return port_info.device
 
         if len(arduino_ports) == 1:
             return arduino_ports[0]
@@ -103,52 +307,118 @@ class ArduinoController:
             logger.error("No Arduino devices detected based on VID/PID.")
             return None
 
-    def prompt_user_to_select_port(self, arduino_ports):
+    def prompt_user_to_select_port(self, arduino_ports, attempts=3):
         """
         Prompt the user to select one Arduino port from the detected list.
+        Invalid input is asked again, without re-scanning the ports.
 
         Args:
             arduino_ports (list of str): List of detected Arduino port names.
+            attempts (int): Number of times to ask before giving up.
 
         Returns:
-            str or None: The selected port name, or None if invalid selection.
+            str or None: The selected port name, or None if no valid selection was made.
         """
         print("Multiple Arduino devices detected. Please select one:")
         for idx, port in enumerate(arduino_ports):
             print(f"{idx + 1}: {port}")
 
-        try:
-            selection = int(input("Enter the number corresponding to your Arduino: "))
+        for _ in range(attempts):
+            try:
+                selection = int(input("Enter the number corresponding to your Arduino: "))
+            except ValueError:
+                logger.error("Invalid input. Please enter a number.")
+                continue
             if 1 <= selection <= len(arduino_ports):
                 selected_port = arduino_ports[selection - 1]
                 logger.info(f"User selected Arduino on port: {selected_port}")
                 return selected_port
-            else:
-                logger.error("Invalid selection.")
-                return None
-        except ValueError:
-            logger.error("Invalid input. Please enter a number.")
-            return None
+            logger.error(f"Invalid selection. Please enter a number between 1 and {len(arduino_ports)}.")
+        logger.error("No valid Arduino port selected.")
+        return None
 
-    def auto_detect_arduino_port_legacy(self):
+    def auto_detect_arduino_port_legacy(self, max_workers=4):
         """
         Auto-detect the Arduino COM port by scanning available ports
         and trying to connect to each.
 
+        Only USB serial ports are probed, since each probe performs a full
+        Firmata handshake. Ports from known Arduino vendors are tried first, then
+        by device name; if several ports answer, the first in that order wins.
+
+        Args:
+            max_workers (int): Maximum number of ports probed at the same time.
+
         Returns:
             str or None: Detected port name, or None if not found.
         """
-        ports = list(serial.tools.list_ports.comports())
-        for port_info in ports:
-            try:
-                test_board = pyfirmata.Arduino(port_info.device)
-                test_board.exit()
-                logger.info(f"Arduino detected on port: {port_info.device}")
-                return str(port_info.device)
-            except Exception:
-                continue
+        known_vids = {vid for vid, _ in self.ARDUINO_VID_PID}
+        ports = [
+            port_info for port_info in _cached_comports()
+            if port_info.vid is not None  # Skip Bluetooth and legacy serial ports
+        ]
+        ports.sort(key=lambda port_info: (port_info.vid not in known_vids, port_info.device))
+        if not ports:
+            logger.error("Arduino not detected on any port.")
+            return None
+
+        # Handshakes block for seconds each, so probe the ports concurrently.
+        # Results are taken in port order rather than completion order, so the
+        # detected port does not depend on which handshake happens to finish first.
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(ports)))
+        futures = [executor.submit(self._probe_port, port_info.device) for port_info in ports]
+        try:
+            for future in futures:
+                port = future.result()
+                if port:
+                    logger.info(f"Arduino detected on port: {port}")
+                    return port
+        finally:
+            # Drop probes that have not started; running ones close their own board
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
         logger.error("Arduino not detected on any port.")
         return None
+
+    @staticmethod
+    def _probe_port(device):
+        """
+        Try a Firmata handshake on a port.
+
+        Args:
+            device (str): The port name to probe.
+
+        Returns:
+            str or None: The port name if an Arduino answered, None otherwise.
+        """
+        try:
+            test_board = pyfirmata.Arduino(device)
+            test_board.exit()
+            return str(device)
+        except Exception:
+            return None
+
+    def _claim_digital_pin(self, pin, mode):
+        """
+        Get the pyfirmata Pin object of a digital pin in the given mode.
+        A pin already set up in the same mode by another controller sharing
+        the board is reused, since pyfirmata hands each pin out only once.
+
+        Args:
+            pin (int): The Arduino digital pin number.
+            mode (str): 'i' for input or 'o' for output.
+
+        Returns:
+            pyfirmata.Pin: The pin object.
+        """
+        if pin < len(self.board.digital) and self.board.taken['digital'][pin]:
+            existing = self.board.digital[pin]
+            if existing.mode == (pyfirmata.INPUT if mode == 'i' else pyfirmata.OUTPUT):
+                return existing
+        # Raises PinAlreadyTakenError if the pin is used in another mode
+        return self.board.get_pin(f'd:{pin}:{mode}')
+
     def setup_digital_output(self, pin):
         """
         Setup a digital pin for output.
@@ -158,7 +428,8 @@ class ArduinoController:
         """
         if self.board:
             try:
-                self.output_pins[pin] = self.board.get_pin(f'd:{pin}:o')
+                self.output_pins[pin] = self._claim_digital_pin(pin, 'o')
+                self._pin_writers[pin] = self.output_pins[pin].write
                 self.set_digital(pin, False)
                 logger.info(f"Set up digital output on pin {pin}.")
             except Exception as e:
@@ -174,10 +445,11 @@ class ArduinoController:
             pin (int): The pin number to set.
             val (bool): True for HIGH, False for LOW.
         """
-        if pin in self.output_pins:
+        writer = self._pin_writers.get(pin)
+        if writer is not None:
             try:
-                self.output_pins[pin].write(val)
-                logger.debug(f"Pin {pin} set to {'HIGH' if val else 'LOW'}.")
+                writer(val)
+                logger.debug("Pin %d set to %s.", pin, 'HIGH' if val else 'LOW')
             except Exception as e:
                 logger.error(f"Failed to set pin {pin} to {'HIGH' if val else 'LOW'}: {e}")
         else:
@@ -192,10 +464,17 @@ class ArduinoController:
         """
         if self.board:
             try:
-                self.input_pins[pin] = self.board.get_pin(f'd:{pin}:i')
+                self.input_pins[pin] = self._claim_digital_pin(pin, 'i')
                 self.input_pins[pin].enable_reporting()
+                self._pin_readers[pin] = self.input_pins[pin].read
                 initial_state = self.read_digital(pin)
                 self.prev_states[pin] = initial_state if initial_state is not None else False
+                # Seed the port bitmask used for edge detection with the initial state
+                port_nr, bit = divmod(pin, 8)
+                mask = self.port_states.get(port_nr, 0) & ~(1 << bit)
+                self.port_states[port_nr] = mask | (int(self.prev_states[pin]) << bit)
+                self.falling_edge_events[pin] = threading.Event()
+                self.rising_edge_events[pin] = threading.Event()
                 logger.info(f"Set up digital input on pin {pin}.")
             except Exception as e:
                 logger.error(f"Failed to set up digital input on pin {pin}: {e}")
@@ -212,9 +491,10 @@ class ArduinoController:
         Returns:
             bool: The current state of the pin, or False if not configured / None.
         """
-        if pin in self.input_pins:
+        reader = self._pin_readers.get(pin)
+        if reader is not None:
             try:
-                state = self.input_pins[pin].read()
+                state = reader()
                 return bool(state) if state is not None else False
             except Exception as e:
                 logger.error(f"Failed to read digital pin {pin}: {e}")
@@ -223,62 +503,173 @@ class ArduinoController:
             logger.warning(f"Pin {pin} not configured as input.")
             return False
 
-    def check_rising_edge(self, pin):
+    def _detect_edges(self, port_nr, mask):
         """
-        Check for a rising edge (LOW -> HIGH transition) on the specified pin.
+        Flag rising and falling edges on configured input pins of a port.
+        Called on the pyfirmata iterator thread for every digital message.
 
         Args:
-            pin (int): The pin number to check.
+            port_nr (int): The digital port number (8 pins per port).
+            mask (int): The new state of the port's 8 pins.
+        """
+        # Compare the whole port at once: bits that went 0 -> 1 are rising
+        # edges, bits that went 1 -> 0 are falling edges
+        prev_mask = self.port_states.get(port_nr, 0)
+        self.port_states[port_nr] = mask
+        rising = mask & ~prev_mask
+        falling = prev_mask & ~mask
+        if not (rising or falling):
+            return
+
+        # Copy the items, as pins may be set up while the iterator thread runs
+        for pin, event in list(self.rising_edge_events.items()):
+            if pin // 8 != port_nr:
+                continue
+            bit = 1 << (pin % 8)
+            if rising & bit:
+                logger.debug("Rising edge reported on pin %d", pin)
+                event.set()
+            elif falling & bit:
+                logger.debug("Falling edge reported on pin %d", pin)
+                self.falling_edge_events[pin].set()
+
+    def wait_rising_edge(self, pin, timeout=None):
+        """
+        Wait for a rising edge (LOW -> HIGH transition) on the specified pin.
+        Edges are detected as they are reported by the board, so an edge that
+        occurred since the last call is returned immediately.
+
+        Args:
+            pin (int): The pin number to wait on.
+            timeout (float or None): Maximum time to wait in seconds. None waits indefinitely.
 
         Returns:
-            bool: True if a rising edge is detected, False otherwise.
+            bool: True if a rising edge was detected, False on timeout.
+        """
+        return self._wait_edge(self.rising_edge_events, pin, timeout)
+
+    def wait_falling_edge(self, pin, timeout=None):
+        """
+        Wait for a falling edge (HIGH -> LOW transition) on the specified pin.
+        Edges are detected as they are reported by the board, so an edge that
+        occurred since the last call is returned immediately.
+
+        Args:
+            pin (int): The pin number to wait on.
+            timeout (float or None): Maximum time to wait in seconds. None waits indefinitely.
+
+        Returns:
+            bool: True if a falling edge was detected, False on timeout.
+        """
+        return self._wait_edge(self.falling_edge_events, pin, timeout)
+
+    def _wait_edge(self, events, pin, timeout):
+        """
+        Wait on and consume the edge event of a pin from the given event table.
         """
-        if pin not in self.input_pins:
+        event = events.get(pin)
+        if event is None:
             logger.warning(f"Pin {pin} not configured as input.")
+            # Still honor the timeout so polling callers keep their pace
+            if timeout:
+                time.sleep(timeout)
             return False
 
-        current_state = self.read_digital(pin)
-        prev_state = self.prev_states.get(pin, current_state)
-        self.prev_states[pin] = current_state
-
-        if not prev_state and current_state:
-            logger.debug(f"Rising edge detected on pin {pin}")
+        if event.wait(timeout):
+            event.clear()
             return True
         return False
 
-    def check_falling_edge(self, pin):
+    def clear_rising_edge(self, pin):
         """
-        Check for a falling edge (HIGH -> LOW transition) on the specified pin.
+        Discard any rising edge recorded on the specified pin.
+
+        Args:
+            pin (int): The pin number to clear.
+        """
+        event = self.rising_edge_events.get(pin)
+        if event is not None:
+            event.clear()
+
+    def clear_falling_edge(self, pin):
+        """
+        Discard any falling edge recorded on the specified pin.
+
+        Args:
+            pin (int): The pin number to clear.
+        """
+        event = self.falling_edge_events.get(pin)
+        if event is not None:
+            event.clear()
+
+    def _sample_edge(self, pin):
+        """
+        Read an input pin once and compare it with the previously sampled state.
 
         Args:
             pin (int): The pin number to check.
 
         Returns:
-            bool: True if a falling edge is detected, False otherwise.
+            str or None: 'rising', 'falling', or None if the state did not change.
         """
-        if pin not in self.input_pins:
+        reader = self._pin_readers.get(pin)
+        if reader is None:
             logger.warning(f"Pin {pin} not configured as input.")
-            return False
+            return None
 
-        current_state = self.read_digital(pin)
+        current_state = bool(reader())
         prev_state = self.prev_states.get(pin, current_state)
         self.prev_states[pin] = current_state
 
+        if current_state and not prev_state:
+            logger.debug("Rising edge detected on pin %d", pin)
+            return 'rising'
         if prev_state and not current_state:
-            logger.debug(f"Falling edge detected on pin {pin}")
-            return True
-        return False
+            logger.debug("Falling edge detected on pin %d", pin)
+            return 'falling'
+        return None
+
+    def check_rising_edge(self, pin):
+        """
+        Check for a rising edge (LOW -> HIGH transition) on the specified pin.
+        Prefer wait_rising_edge, which also reports edges between calls.
+
+        Args:
+            pin (int): The pin number to check.
+
+        Returns:
+            bool: True if a rising edge is detected, False otherwise.
+        """
+        return self._sample_edge(pin) == 'rising'
+
+    def check_falling_edge(self, pin):
+        """
+        Check for a falling edge (HIGH -> LOW transition) on the specified pin.
+        Prefer wait_falling_edge, which also reports edges between calls.
+
+        Args:
+            pin (int): The pin number to check.
+
+        Returns:
+            bool: True if a falling edge is detected, False otherwise.
+        """
+        return self._sample_edge(pin) == 'falling'
 
     def close(self):
         """
-        Close the connection to the Arduino board if open.
+        Close the connection to the Arduino board if open. A connection shared
+        with other controllers stays open until the last of them is closed.
         """
-        if self.board:
-            try:
-                self.board.exit()
+        if self._shared is None:
+            return
+        shared, self._shared = self._shared, None
+        try:
+            if _release_board(shared, self):
                 logger.info("Connection to Arduino board closed.")
-            except Exception as e:
-                logger.error(f"Error while closing Arduino connection: {e}")
+            else:
+                logger.info("Detached from shared Arduino connection.")
+        except Exception as e:
+            logger.error(f"Error while closing Arduino connection: {e}")
 
 # Unit test for the ArduinoController class
 if __name__ == "__main__":
@@ -307,20 +698,27 @@ if __name__ == "__main__":
             arduino.setup_digital_output(output_pin)
             logging.info(f"Digital output set up on pin {output_pin}. Beginning to blink signal.")
 
-            print(f"Reading digital pin {input_pin} and blinking signal on pin {output_pin}. Press 'Ctrl + C' to stop.")
+            print(f"Watching digital pin {input_pin} and blinking signal on pin {output_pin}. Press 'Ctrl + C' to stop.")
+            signal_state = False
             while True:
                 # Blink signal
-                arduino.set_digital(output_pin, True)
-                logging.info(f"Signal on pin {output_pin} set to HIGH")
-                time.sleep(1)
-
-                arduino.set_digital(output_pin, False)
-                logging.info(f"Signal on pin {output_pin} set to LOW")
-                time.sleep(1)
-
-                # Read state of digital input pin input_pin
-                state_input_pin = arduino.read_digital(6)
-                logging.info(f"Pin 6 state: {state_input_pin}")
+                signal_state = not signal_state
+                arduino.set_digital(output_pin, signal_state)
+                logging.info(f"Signal on pin {output_pin} set to {'HIGH' if signal_state else 'LOW'}")
+
+                # Report edges on input_pin as they arrive until the next blink,
+                # instead of sleeping and sampling the pin once per blink.
+                # Both edge events are checked every 10 ms, so neither kind
+                # waits for the other to be reported.
+                deadline = time.monotonic() + 1
+                while True:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    if arduino.wait_falling_edge(input_pin, timeout=0):
+                        logging.info(f"Falling edge on pin {input_pin}")
+                    if arduino.wait_rising_edge(input_pin, timeout=min(0.01, remaining)):
+                        logging.info(f"Rising edge on pin {input_pin}")
 
         except KeyboardInterrupt:
             logging.info("Test interrupted by user.")
@@ -1,9 +1,31 @@
 import cv2
+import numpy as np
+import threading
+from collections import deque
 from pypylon import pylon
 import logging
 
 logger = logging.getLogger(__name__)
 
+class _FrameHandler(pylon.ImageEventHandler):
+    """
+    Image event handler that forwards frames from pylon's grab loop thread
+    to the owning Camera instance.
+    """
+
+    def __init__(self, owner, index):
+        """
+        Args:
+            owner (Camera): The Camera instance receiving the frames.
+            index (int): Index of the camera this handler is registered on.
+        """
+        super().__init__()
+        self.owner = owner
+        self.index = index
+
+    def OnImageGrabbed(self, camera, grab_result):
+        self.owner._on_image_grabbed(self.index, grab_result)
+
 class Camera:
     """
     A class to manage one or more Basler cameras via the pypylon library.
@@ -12,7 +34,9 @@ class Camera:
 
     def __init__(
         self, width=2448, height=2048, exposure_time=5000,
-        timeout=5000, scale_factor=0.5
+        timeout=5000, scale_factor=0.5, buffer_pool_size=None,
+        max_num_buffer=20, max_transfer_size=None, pixel_format='Mono8',
+        gev_packet_size=None, gev_inter_packet_delay=None
     ):
         """
         Initialize the camera controller with configurable parameters.
@@ -23,38 +47,171 @@ class Camera:
             exposure_time (int|float): Initial/manual exposure time (µs).
             timeout (int): Timeout for capturing frames (ms).
             scale_factor (float): Factor to scale frames for display.
+            buffer_pool_size (int or None): Maximum number of released frame buffers
+                kept for reuse. Defaults to four per camera.
+            max_num_buffer (int): Number of pylon grab buffers allocated per camera.
+            max_transfer_size (int or None): USB stream grabber transfer size in bytes.
+                None keeps the driver default.
+            pixel_format (str or None): Camera pixel format, e.g. 'Mono8'. DIC speckle
+                images are grayscale, so Mono8 moves a third of the bytes of a color format.
+                None keeps the camera's current format.
+            gev_packet_size (int or None): GigE stream packet size in bytes (e.g. 8192,
+                requires jumbo frames). None keeps the camera default.
+            gev_inter_packet_delay (int or None): GigE inter-packet delay in ticks, used to
+                share link bandwidth between several cameras. None keeps the camera default.
         """
         self.width = width
         self.height = height
         self.exposure_time = exposure_time
         self.timeout = timeout
         self.scale_factor = scale_factor
+        self.buffer_pool_size = buffer_pool_size
+        self.max_num_buffer = max_num_buffer
+        self.max_transfer_size = max_transfer_size
+        self.pixel_format = pixel_format
+        self.gev_packet_size = gev_packet_size
+        self.gev_inter_packet_delay = gev_inter_packet_delay
         self.cameras = []
+        self._model_names = []
+        self._exposure_nodes = []
+        self._exposure_auto_nodes = []
+        self.grabbing = False
+        self._free_buffers = deque()
+        self._latest_frames = []
+        self._frame_cond = threading.Condition()
+        # Set while grab_frames waits; frames arriving otherwise are not copied
+        self._frames_wanted = False
+        self._display_canvas = None
+        self._display_size = None
+        self._display_source = None
+        self._windows = set()
+        # useOpenCL also honours cv2.ocl.setUseOpenCL(False) and OPENCV_OPENCL_RUNTIME=disabled
+        self.use_opencl = cv2.ocl.useOpenCL()
 
     def initialize_cameras(self):
         """
         Initialize and open all available Basler cameras.
-        After opening, set the default width, height, and exposure time.
+        After opening, set the default pixel format, width, height, and grab buffer settings.
         """
         devices = pylon.TlFactory.GetInstance().EnumerateDevices()
         self.cameras = [
             pylon.InstantCamera(pylon.TlFactory.GetInstance().CreateDevice(device))
             for device in devices
         ]
-        for camera in self.cameras:
+        # Model names are only used for logging; look them up once
+        self._model_names = [camera.GetDeviceInfo().GetModelName() for camera in self.cameras]
+        for camera, model_name in zip(self.cameras, self._model_names):
             camera.Open()
+            if self.pixel_format is not None:
+                try:
+                    camera.PixelFormat.SetValue(self.pixel_format)
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to set PixelFormat {self.pixel_format} for camera "
+                        f"{model_name}: {e}"
+                    )
             camera.Width.SetValue(self.width)
             camera.Height.SetValue(self.height)
+            # Deeper buffering absorbs stalls downstream of the grab
+            camera.MaxNumBuffer.SetValue(self.max_num_buffer)
+            if self.max_transfer_size is not None:
+                try:
+                    camera.StreamGrabber.MaxTransferSize.SetValue(self.max_transfer_size)
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to set MaxTransferSize for camera "
+                        f"{model_name}: {e}"
+                    )
+            # GigE transport settings; USB cameras do not have these nodes
+            if self.gev_packet_size is not None:
+                try:
+                    camera.GevSCPSPacketSize.SetValue(self.gev_packet_size)
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to set GevSCPSPacketSize for camera "
+                        f"{model_name}: {e}"
+                    )
+            if self.gev_inter_packet_delay is not None:
+                try:
+                    camera.GevSCPD.SetValue(self.gev_inter_packet_delay)
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to set GevSCPD for camera "
+                        f"{model_name}: {e}"
+                    )
+        # Look the exposure nodes up once; they stay valid while the cameras are open.
+        # A camera without them keeps None and reports an error whenever exposure is used.
+        self._exposure_nodes = [
+            self._lookup_node(camera, model_name, 'ExposureTime')
+            for camera, model_name in zip(self.cameras, self._model_names)
+        ]
+        self._exposure_auto_nodes = [
+            self._lookup_node(camera, model_name, 'ExposureAuto')
+            for camera, model_name in zip(self.cameras, self._model_names)
+        ]
         logger.info("All cameras initialized, opened, and default settings applied.")
 
+    @staticmethod
+    def _lookup_node(camera, model_name, node_name):
+        """
+        Look up a GenICam node of an open camera.
+
+        Args:
+            camera (pylon.InstantCamera): The open camera.
+            model_name (str): Camera model name, for logging.
+            node_name (str): Name of the node, e.g. 'ExposureTime'.
+
+        Returns:
+            The node, or None if the camera does not provide it.
+        """
+        try:
+            return getattr(camera, node_name)
+        except Exception as e:
+            logger.error(f"Camera {model_name} has no {node_name} node: {e}")
+            return None
+
     def start_grabbing(self):
         """
         Start grabbing for all initialized cameras using the LatestImageOnly strategy.
+        Frames are delivered by pylon's own grab loop thread (one per camera) to
+        an image event handler, which keeps the most recent frame of each camera.
         """
-        for camera in self.cameras:
+        with self._frame_cond:
+            self._latest_frames = [None] * len(self.cameras)
+        for index, camera in enumerate(self.cameras):
             if not camera.IsGrabbing():
-                camera.StartGrabbing(pylon.GrabStrategy_LatestImageOnly)
-        logger.info("All cameras started grabbing.")
+                camera.RegisterImageEventHandler(
+                    _FrameHandler(self, index),
+                    pylon.RegistrationMode_ReplaceAll,
+                    pylon.Cleanup_Delete
+                )
+                camera.StartGrabbing(
+                    pylon.GrabStrategy_LatestImageOnly,
+                    pylon.GrabLoop_ProvidedByInstantCamera
+                )
+        grabbing = [camera.IsGrabbing() for camera in self.cameras]
+        self.grabbing = any(grabbing)
+        if all(grabbing):
+            logger.info("All cameras started grabbing.")
+        else:
+            logger.error("Not all cameras started grabbing.")
+
+    def stop_grabbing(self):
+        """
+        Stop grabbing on all cameras but keep them open and configured,
+        so grabbing can be resumed quickly with start_grabbing.
+        """
+        self.grabbing = False
+        for camera in self.cameras:
+            if camera.IsGrabbing():
+                camera.StopGrabbing()
+        # Recycle frames that were grabbed but never handed out
+        with self._frame_cond:
+            stale_frames = [frame for frame in self._latest_frames if frame is not None]
+            self._latest_frames = [None] * len(self.cameras)
+        for frame in stale_frames:
+            self.release_frame(frame)
+        logger.info("All cameras stopped grabbing.")
 
     def set_auto_exposure(self, mode='Once'):
         """
@@ -73,23 +230,31 @@ class Camera:
             return self.exposure_time
 
         exposure_times = []
-        for camera in self.cameras:
+        for model_name, exposure_auto, exposure_node in zip(
+            self._model_names, self._exposure_auto_nodes, self._exposure_nodes
+        ):
+            if exposure_auto is None or exposure_node is None:
+                logger.error(
+                    f"Failed to enable auto-exposure for camera "
+                    f"{model_name}: exposure nodes not available"
+                )
+                continue
             try:
-                camera.ExposureAuto.SetValue(mode)
+                exposure_auto.SetValue(mode)
                 logger.info(
                     f"Auto-exposure '{mode}' enabled for camera: "
-                    f"{camera.GetDeviceInfo().GetModelName()}"
+                    f"{model_name}"
                 )
                 # The actual exposure time might not instantly match, but let's read it
-                exposure_time = camera.ExposureTime.GetValue()
+                exposure_time = exposure_node.GetValue()
                 exposure_times.append(exposure_time)
                 logger.debug(
-                    f"Camera {camera.GetDeviceInfo().GetModelName()} current exposure: {exposure_time} µs"
+                    f"Camera {model_name} current exposure: {exposure_time} µs"
                 )
             except Exception as e:
                 logger.error(
                     f"Failed to enable auto-exposure for camera "
-                    f"{camera.GetDeviceInfo().GetModelName()}: {e}"
+                    f"{model_name}: {e}"
                 )
         if exposure_times:
             average_exp = sum(exposure_times) / len(exposure_times)
@@ -107,24 +272,122 @@ class Camera:
             logger.error("No cameras available to set manual exposure.")
             return
 
-        for camera in self.cameras:
+        for model_name, exposure_auto, exposure_node in zip(
+            self._model_names, self._exposure_auto_nodes, self._exposure_nodes
+        ):
+            if exposure_auto is None or exposure_node is None:
+                logger.error(
+                    f"Failed to set manual exposure for camera "
+                    f"{model_name}: exposure nodes not available"
+                )
+                continue
             try:
-                camera.ExposureAuto.SetValue('Off')
-                camera.ExposureTime.SetValue(exposure_time)
+                exposure_auto.SetValue('Off')
+                exposure_node.SetValue(exposure_time)
                 logger.info(
                     f"Manual exposure set to {exposure_time} µs for camera: "
-                    f"{camera.GetDeviceInfo().GetModelName()}"
+                    f"{model_name}"
                 )
             except Exception as e:
                 logger.error(
                     f"Failed to set manual exposure for camera "
-                    f"{camera.GetDeviceInfo().GetModelName()}: {e}"
+                    f"{model_name}: {e}"
                 )
 
+    def get_exposure_times(self):
+        """
+        Read the current exposure time of every camera.
+
+        Returns:
+            list of float or None: Exposure time (µs) per camera, in camera order;
+                None for a camera whose exposure could not be read.
+        """
+        exposure_times = []
+        for model_name, exposure_node in zip(self._model_names, self._exposure_nodes):
+            try:
+                exposure_times.append(exposure_node.GetValue())
+            except Exception as e:
+                logger.error(f"Failed to read exposure time of camera {model_name}: {e}")
+                exposure_times.append(None)
+        return exposure_times
+
+    def _acquire_buffer(self, shape, dtype):
+        """
+        Take a frame buffer from the pool, or allocate one if none is free.
+
+        Args:
+            shape (tuple): Required buffer shape.
+            dtype (np.dtype): Required buffer data type.
+
+        Returns:
+            np.ndarray: An uninitialized buffer of the requested shape and type.
+        """
+        while True:
+            try:
+                buffer = self._free_buffers.pop()
+            except IndexError:
+                return np.empty(shape, dtype=dtype)
+            if buffer.shape == shape and buffer.dtype == dtype:
+                return buffer
+
+    def release_frame(self, frame):
+        """
+        Return a frame obtained from grab_frames to the buffer pool once it is no
+        longer used (e.g. after it has been written to disk). Safe to call from
+        any thread.
+
+        Args:
+            frame (np.ndarray): The frame buffer to recycle.
+        """
+        pool_size = self.buffer_pool_size or 4 * max(len(self.cameras), 1)
+        if len(self._free_buffers) < pool_size:
+            self._free_buffers.append(frame)
+
+    def _on_image_grabbed(self, index, grab_result):
+        """
+        Store a newly grabbed frame as the latest frame of a camera.
+        Called on pylon's grab loop thread. Frames are only copied out while
+        grab_frames is waiting for them; the cameras free-run between captures.
+
+        Args:
+            index (int): Index of the camera that grabbed the frame.
+            grab_result (pylon.GrabResult): The grab result, valid only during this call.
+        """
+        if not grab_result.GrabSucceeded():
+            # Lazy %-formatting: this can fire at frame rate when a camera misbehaves
+            logger.error("Failed to grab frame from camera: %s", self._model_names[index])
+            return
+        # Unlocked fast path; the flag is checked again before storing
+        if not self._frames_wanted:
+            return
+
+        # Copy out of the pylon buffer, which is reused once the handler returns
+        with grab_result.GetArrayZeroCopy() as array:
+            frame = self._acquire_buffer(array.shape, array.dtype)
+            np.copyto(frame, array)
+
+        with self._frame_cond:
+            if self._frames_wanted:
+                previous = self._latest_frames[index]
+                self._latest_frames[index] = frame
+                self._frame_cond.notify_all()
+            else:
+                # The request ended while copying
+                previous = frame
+        if previous is not None:
+            # Never handed out by grab_frames, so it can be recycled
+            self.release_frame(previous)
+
     def grab_frames(self):
         """
         Grab frames from all the initialized cameras.
 
+        Returns the most recent frame each camera grabbed during the call, waiting
+        up to the camera timeout for all cameras to deliver one. The wait is woken by
+        each frame arrival, so it ends as soon as the last camera delivers.
+        Frames are pooled numpy buffers owned by the caller; pass them back to
+        release_frame when done with them to avoid reallocating buffers.
+
         Returns:
             list of np.ndarray: The captured frames (one per camera).
         """
@@ -133,42 +396,103 @@ class Camera:
             logger.warning("No cameras available to grab frames.")
             return frames
 
-        for camera in self.cameras:
-            if camera.IsGrabbing():
-                try:
-                    grab_result = camera.RetrieveResult(
-                        self.timeout, pylon.TimeoutHandling_ThrowException
-                    )
-                    if grab_result.GrabSucceeded():
-                        frames.append(grab_result.Array)
-                    else:
-                        logger.error(
-                            f"Failed to grab frame from camera: "
-                            f"{camera.GetDeviceInfo().GetModelName()}"
-                        )
-                    grab_result.Release()
-                except Exception as e:
-                    logger.error(
-                        f"Exception while grabbing frame from camera "
-                        f"{camera.GetDeviceInfo().GetModelName()}: {e}"
-                    )
-            else:
-                logger.error(
-                    f"Camera {camera.GetDeviceInfo().GetModelName()} "
-                    "is not grabbing."
+        # Grabbing state is checked once here rather than per camera per grab
+        if not self.grabbing:
+            logger.error("Cameras are not grabbing.")
+            return frames
+
+        with self._frame_cond:
+            self._frames_wanted = True
+            try:
+                self._frame_cond.wait_for(
+                    lambda: all(frame is not None for frame in self._latest_frames),
+                    timeout=self.timeout / 1000
                 )
+            finally:
+                self._frames_wanted = False
+            latest_frames = self._latest_frames
+            self._latest_frames = [None] * len(self.cameras)
+
+        for model_name, frame in zip(self._model_names, latest_frames):
+            if frame is None:
+                logger.error("Timed out waiting for a frame from camera %s", model_name)
+            else:
+                frames.append(frame)
         return frames
 
+    def display_frames(self, frames, window_name='Combined Image', interpolation=cv2.INTER_AREA):
+        """
+        Display frames side-by-side in a single OpenCV window, scaled by scale_factor.
+
+        Each frame is resized directly into its slot of a display canvas that is
+        allocated once and reused, so no per-frame or concatenation buffers are created.
+        The scaled size is computed only when the canvas is (re)allocated.
+
+        Args:
+            frames (list of np.ndarray): The frames to display (same shape and type).
+            window_name (str): Name of the OpenCV window.
+            interpolation (int): OpenCV interpolation flag used for downscaling.
+                INTER_AREA gives the best quality for shrinking and is SIMD-optimized.
+        """
+        if not frames:
+            return
+
+        if (
+            self._display_canvas is None
+            or self._display_source != (frames[0].shape, frames[0].dtype, len(frames))
+        ):
+            self._allocate_display_canvas(frames)
+
+        scaled_width, scaled_height = self._display_size
+        for i, frame in enumerate(frames):
+            slot = self._display_canvas[:, i * scaled_width:(i + 1) * scaled_width]
+            if self.use_opencl:
+                # Resample on the GPU and download only the small preview
+                slot[...] = cv2.resize(
+                    cv2.UMat(frame), self._display_size, interpolation=interpolation
+                ).get()
+            else:
+                cv2.resize(frame, self._display_size, dst=slot, interpolation=interpolation)
+        if window_name not in self._windows:
+            self._create_window(window_name)
+        cv2.imshow(window_name, self._display_canvas)
+
+    def _create_window(self, window_name):
+        """
+        Create a display window, backed by OpenGL where OpenCV supports it so the
+        canvas is composited on the GPU. Falls back to a regular window otherwise.
+        """
+        try:
+            cv2.namedWindow(window_name, cv2.WINDOW_OPENGL | cv2.WINDOW_NORMAL)
+        except cv2.error:
+            logger.debug("OpenCV built without OpenGL support; using a regular window.")
+            cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+        self._windows.add(window_name)
+
+    def _allocate_display_canvas(self, frames):
+        """
+        Compute the scaled frame size and allocate the display canvas for the given frames.
+        """
+        frame_height, frame_width = frames[0].shape[:2]
+        scaled_width = max(int(frame_width * self.scale_factor), 1)
+        scaled_height = max(int(frame_height * self.scale_factor), 1)
+        self._display_size = (scaled_width, scaled_height)
+        self._display_source = (frames[0].shape, frames[0].dtype, len(frames))
+        canvas_shape = (scaled_height, scaled_width * len(frames)) + frames[0].shape[2:]
+        self._display_canvas = np.empty(canvas_shape, dtype=frames[0].dtype)
+
     def close_cameras(self):
         """
         Stop grabbing and close all cameras, then release any OpenCV windows.
         """
+        self.grabbing = False
         for camera in self.cameras:
             if camera.IsGrabbing():
                 camera.StopGrabbing()
             if camera.IsOpen():
                 camera.Close()
         cv2.destroyAllWindows()
+        self._windows.clear()
         logger.info("All cameras closed.")
 
 # Unit test for the Camera class
@@ -185,19 +509,16 @@ if __name__ == "__main__":
             # Initialize the Camera class with some test values
             camera = Camera(exposure_time=10000, scale_factor=0.25)
 
-            # Step 1: Initialize the cameras
+            # Step 1: Initialize the cameras (applies pixel format, size and buffer settings)
             camera.initialize_cameras()
 
-            # Step 2: Set camera settings
-            camera.set_camera_settings()
-
-            # Step 3: Set auto exposure
+            # Step 2: Set auto exposure
             camera.set_auto_exposure('Once')
 
             # # OR: Set manual exposure (e.g., 10000 µs)
             # camera.set_manual_exposure(10000)
 
-            # Step 4: Start grabbing frames
+            # Step 3: Start grabbing frames
             camera.start_grabbing()
             print("Streaming frames. Press 'q' to stop.")
             while True:
@@ -209,7 +530,7 @@ if __name__ == "__main__":
                 if cv2.waitKey(1) & 0xFF == ord('q'):
                     break
 
-            # Step 5: Close the cameras
+            # Step 4: Close the cameras
             camera.close_cameras()
 
         except Exception as e:
@@ -11,14 +11,16 @@ GitHub:      https://github.com/ForMat-Lab/Robotic-3D-DIC
 import os
 import time
 import csv
+import cProfile
+import pstats
 import logging
 import cv2
-import numpy as np
 from datetime import datetime, timedelta
 
 from src.Arduino import ArduinoController
 from src.Camera import Camera
-from src.util import generate_pdf_report
+from src.ImageWriter import ImageWriter
+from src.util import generate_pdf_report, format_timestamp
 
 logger = logging.getLogger(__name__)
 
@@ -57,6 +59,8 @@ class Experiment:
         
         self.scale_factor = config.get('display_scale_factor', 0.5)
         self.display_images = config.get('display_images', True)
+        self._last_display_time = 0.0
+        self.profile_runs = config.get('profile_runs', False)
 
         # Arduino pins
         arduino_input_pins = config['arduino_settings']['input_pins']
@@ -67,8 +71,11 @@ class Experiment:
         self.DI_CAPTURE_COMPLETE_pin = arduino_output_pins['DI_CAPTURE_COMPLETE']
 
         # Arduino port
+        self.capture_ack_timeout = config['arduino_settings'].get('capture_ack_timeout', 10)
+        self.capture_complete_pulse_ms = config['arduino_settings'].get('capture_complete_pulse_ms', 50)
         self.auto_detect_port = config['arduino_settings'].get('auto_detect_port', False)
         self.arduino_port = None if self.auto_detect_port else config['arduino_settings']['port']
+        self.use_first_detected_port = config['arduino_settings'].get('use_first_detected_port', True)
 
         # Experiment parameters
         self.turn_off_cameras_between_runs = config.get("turn_off_cameras_between_runs", True)
@@ -77,7 +84,8 @@ class Experiment:
         self.interval_calculation_mode = config.get("interval_calculation_mode", "constant_interval")
         self.total_runs = config.get('total_runs', -1)  # -1 => infinite
         self.visit_counts = [0] * self.num_samples
-        self.start_time = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        self.start_timestamp = time.time()
+        self.start_time = format_timestamp(self.start_timestamp)
         self.run_start_time = None
         self.next_run_start_time = None
         self.run_count = 0
@@ -98,8 +106,10 @@ class Experiment:
                 self.exposure_table_path = os.path.join(self.output_base_folder, "exposure_table.csv")
             self.load_exposure_table()
 
-        # Initialize the CSV file
-        self.csv_file = open(self.csv_log_path, 'a', newline='', encoding='utf-8')
+        # Initialize the CSV file; capture rows are buffered and written once per run
+        self._csv_rows = []
+        # Large buffer so a run's rows reach the OS in a few writes at flush time
+        self.csv_file = open(self.csv_log_path, 'a', buffering=1 << 20, newline='', encoding='utf-8')
         self.csv_writer = csv.writer(self.csv_file)
         if os.path.getsize(self.csv_log_path) == 0:
             # Write header if the file is new
@@ -114,6 +124,12 @@ class Experiment:
             ])
             self.csv_file.flush()
 
+        # Background writer for captured images
+        self.image_writer = ImageWriter(compression=config.get('tiff_compression'))
+        # The writer threads already occupy the cores; keep OpenCV's preview
+        # resizing single-threaded so its thread pool does not oversubscribe them
+        cv2.setNumThreads(1)
+
         # Initialize Arduino and cameras
         self.arduino = self.initialize_arduino()
         self.cameras = self.initialize_cameras()
@@ -125,7 +141,9 @@ class Experiment:
         Returns:
             ArduinoController: Configured Arduino controller instance.
         """
-        arduino_controller = ArduinoController(port=self.arduino_port)
+        arduino_controller = ArduinoController(
+            port=self.arduino_port, early_exit=self.use_first_detected_port
+        )
 
         # Configure input pins
         input_pins = self.config['arduino_settings']['input_pins']
@@ -153,7 +171,12 @@ class Experiment:
                 width=self.config['camera_settings']['width'],
                 height=self.config['camera_settings']['height'],
                 exposure_time=self.exposure_time,
-                scale_factor=self.scale_factor
+                scale_factor=self.scale_factor,
+                max_num_buffer=self.config['camera_settings'].get('max_num_buffer', 20),
+                max_transfer_size=self.config['camera_settings'].get('max_transfer_size'),
+                pixel_format=self.config['camera_settings'].get('pixel_format', 'Mono8'),
+                gev_packet_size=self.config['camera_settings'].get('gev_packet_size'),
+                gev_inter_packet_delay=self.config['camera_settings'].get('gev_inter_packet_delay')
             )
             camera.initialize_cameras()
 
@@ -202,6 +225,8 @@ class Experiment:
             os.makedirs(folder_path, exist_ok=True)
             self.sample_folders.append(folder_path)
             logger.info(f"Sample folder created at {folder_path}")
+        # Folder paths with a trailing separator, ready to prepend to image names
+        self._sample_folder_prefixes = [folder + os.sep for folder in self.sample_folders]
 
     def run(self):
         """
@@ -224,7 +249,10 @@ class Experiment:
             # Main run loop
             while self.total_runs == -1 or self.run_count < self.total_runs:
                 logger.info(f"Starting run {self.run_count}")
-                self.execute_run()
+                if self.profile_runs:
+                    self.execute_profiled_run()
+                else:
+                    self.execute_run()
                 self.run_count += 1
 
                 if self.total_runs != -1 and self.run_count >= self.total_runs:
@@ -241,14 +269,20 @@ class Experiment:
         finally:
             self.cleanup()
 
-    def execute_run(self):
+    def execute_run(self, poll_interval=0.01):
         """
         Perform one complete run of the experiment.
 
         Signals the robot to start, then waits for capture signals to take images
         of each sample. Logs the images and sets exposure time if in 'SetOnce' mode.
+
+        Args:
+            poll_interval (float): Maximum time in seconds to wait for a capture
+                edge before checking the run completion signal again.
         """
         logger.info(f"Run {self.run_count}: Signaling robot to start the run.")
+        # Discard capture edges seen before the run was started
+        self.arduino.clear_rising_edge(self.DO_CAPTURE_pin)
         self.arduino.set_digital(self.DI_RUN_pin, True)
         self.run_start_time = time.time()
         # For "constant_interval" mode, calculate next_run_start_time at the beginning of the run.
@@ -261,11 +295,11 @@ class Experiment:
             self.sample_exposures = [None] * self.num_samples
 
         sample_index = 0
+        # Console writes are slow, so only print the status when it changes
+        print("Waiting for capture signal.", end='\r')
         while True:
-            print("Waiting for capture signal.", end='\r')
-
-            # Check capture signal
-            if self.arduino.check_rising_edge(self.DO_CAPTURE_pin):
+            # Wait for the capture signal; returns as soon as the edge is reported
+            if self.arduino.wait_rising_edge(self.DO_CAPTURE_pin, timeout=poll_interval):
                 if sample_index >= self.num_samples:
                     logger.warning(
                         f"Run {self.run_count}: Received more capture signals than samples. Ignoring extras."
@@ -273,19 +307,20 @@ class Experiment:
                     continue
                 self.handle_capture_signal(sample_index)
                 sample_index += 1
+                print("Waiting for capture signal.", end='\r')
 
             # Check run completion signal
             if self.arduino.read_digital(self.DO_RUN_COMPLETE_pin):
                 logger.info(f"Run {self.run_count}: Robot signaled run completion.")
                 break
 
-            # Allow user interruption via 'q'
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                logger.info("Experiment interrupted by user.")
-                raise KeyboardInterrupt
-
-            time.sleep(0.01)
+            # Allow user interruption via 'q' (needs the image window for key events).
+            # pollKey pumps the GUI without waitKey's minimum 1 ms block.
+            if self.display_images:
+                key = cv2.pollKey() & 0xFF
+                if key == ord('q'):
+                    logger.info("Experiment interrupted by user.")
+                    raise KeyboardInterrupt
 
         # If we created a new exposure table for 'SetOnce', save it
         if self.exposure_mode == 'SetOnce' and new_exposure_table:
@@ -293,14 +328,43 @@ class Experiment:
 
         # Reset DI_RUN pin
         self.arduino.set_digital(self.DI_RUN_pin, False)
+        self.flush_capture_log()
         logger.info(f"Run {self.run_count} completed with {sample_index} captures.")
 
-    def handle_capture_signal(self, sample_index, delay=1):
+    def execute_profiled_run(self, top_n=10):
+        """
+        Perform one run under cProfile and write the top cumulative entries
+        to profile_run_<N>.txt in the output folder.
+
+        Args:
+            top_n (int): Number of entries to include in the profile summary.
+        """
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            self.execute_run()
+        finally:
+            profiler.disable()
+            profile_path = os.path.join(self.output_base_folder, f"profile_run_{self.run_count}.txt")
+            with open(profile_path, 'w', encoding='utf-8') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(top_n)
+            logger.info(f"Run {self.run_count}: Profile written to {profile_path}")
+
+    def handle_capture_signal(self, sample_index, ack_timeout=None):
         """
         Handle actions upon receiving a capture signal from the Arduino.
 
         Includes setting exposure (depending on mode), capturing frames, saving them, and logging.
+        DI_CAPTURE_COMPLETE is then held HIGH until the robot acknowledges it by
+        lowering DO_CAPTURE, and for at least capture_complete_pulse_ms.
+
+        Args:
+            sample_index (int): Index of the current sample.
+            ack_timeout (float or None): Maximum time in seconds to wait for the robot's
+                acknowledgement. Defaults to the configured capture_ack_timeout.
         """
+        if ack_timeout is None:
+            ack_timeout = self.capture_ack_timeout
         logger.info(f"Run {self.run_count}, Sample {sample_index}: Capture signal received.")
 
         # SetOnce mode logic
@@ -316,86 +380,138 @@ class Experiment:
                 self.cameras.set_manual_exposure(self.sample_exposures[sample_index])
 
         # Capture frames
-        t0 = datetime.now()
+        # One timestamp shared by the file names and the CSV rows of this capture
+        capture_time = time.time()
         frames = self.cameras.grab_frames()
         if frames:
-            filenames = self.save_images(frames, sample_index)
-            self.log_capture_info(filenames, sample_index, t0)
+            filenames = self.save_images(frames, sample_index, capture_time)
+            # Manual and SetOnce exposures are known; Continuous must be read back
+            if self.exposure_mode == 'Manual':
+                exposure_time = self.exposure_time
+            elif self.exposure_mode == 'SetOnce':
+                exposure_time = self.sample_exposures[sample_index]
+            else:
+                exposure_time = None
+            self.log_capture_info(filenames, sample_index, capture_time, exposure_time)
             logger.info(f"Run {self.run_count}, Sample {sample_index}: Images captured and logged.")
         else:
             logger.error(f"Run {self.run_count}, Sample {sample_index}: No frames captured.")
 
         # Signal capture completion
         logger.info(f"Run {self.run_count}: Signaling robot that capture is complete.")
+        self.arduino.clear_falling_edge(self.DO_CAPTURE_pin)
         self.arduino.set_digital(self.DI_CAPTURE_COMPLETE_pin, True)
-        time.sleep(delay)
+        pulse_start = time.monotonic()
+        if (
+            ack_timeout > 0
+            and self.arduino.read_digital(self.DO_CAPTURE_pin)
+            and not self.arduino.wait_falling_edge(self.DO_CAPTURE_pin, timeout=ack_timeout)
+        ):
+            logger.warning(
+                f"Run {self.run_count}: Robot did not lower DO_CAPTURE within {ack_timeout} s."
+            )
+        # Even when DO_CAPTURE is already LOW (or without a handshake), keep the
+        # pin HIGH long enough for the robot controller to sample it
+        self.hold_capture_complete(pulse_start)
         self.arduino.set_digital(self.DI_CAPTURE_COMPLETE_pin, False)
 
-    def save_images(self, frames, sample_index):
+    def hold_capture_complete(self, pulse_start):
+        """
+        Sleep until DI_CAPTURE_COMPLETE has been HIGH for capture_complete_pulse_ms.
+
+        Args:
+            pulse_start (float): time.monotonic() when the pin was set HIGH.
+        """
+        remaining = self.capture_complete_pulse_ms / 1000 - (time.monotonic() - pulse_start)
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def save_images(self, frames, sample_index, capture_time=None):
         """
         Save the captured frames as TIFF images to the appropriate sample folder.
+        Encoding and writing happen on the background image writer.
 
         Args:
             frames (list of np.ndarray): Frames from each camera.
             sample_index (int): Index of the current sample.
+            capture_time (float or None): Unix time of the capture. Defaults to now.
 
         Returns:
             list of str: List of paths to the saved TIFF files.
         """
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime(capture_time))
         visit_count_str = f'{self.visit_counts[sample_index]:04}'
-        sample_folder = self.sample_folders[sample_index]
+        # Everything but the camera index is shared by all frames of this capture
+        name_prefix = f"sample_{sample_index}_{timestamp}_{visit_count_str}_"
+        path_prefix = self._sample_folder_prefixes[sample_index] + name_prefix
+        release_frame = self.cameras.release_frame
         filenames = []
 
+        # Display before queueing: the writer recycles each frame buffer as soon
+        # as it is written, after which the grab thread may overwrite it
+        if self.display_images:
+            self.show_frames(frames)
+
         for idx, frame in enumerate(frames):
-            filename = f"sample_{sample_index}_{timestamp}_{visit_count_str}_{idx}.tif"
-            filepath = os.path.join(sample_folder, filename)
-            cv2.imwrite(filepath, frame, [cv2.IMWRITE_TIFF_COMPRESSION, 1])
+            filepath = f"{path_prefix}{idx}.tif"
+            self.image_writer.submit(filepath, frame, on_done=release_frame)
             filenames.append(filepath)
-            logger.info(f"Run {self.run_count}, Sample {sample_index}: Saved image {filename}")
+        # One lazily formatted line per capture rather than one per frame
+        logger.info(
+            "Run %d, Sample %d: Queued %d images %s*.tif",
+            self.run_count, sample_index, len(filenames), name_prefix
+        )
 
         self.visit_counts[sample_index] += 1
 
-        # Optionally display the images
-        if self.display_images:
-            self.show_frames(frames)
-
         return filenames
 
-    def show_frames(self, frames, delay=1):
+    def show_frames(self, frames, min_interval=0.1):
         """
         Display the captured frames side-by-side in a single OpenCV window.
+        Refreshes faster than min_interval are skipped, as the preview
+        does not benefit from updating above UI rate.
 
         Args:
             frames (list of np.ndarray): The frames to display.
-            delay (int): Delay in ms for cv2.waitKey (default=1).
+            min_interval (float): Minimum time in seconds between display refreshes.
         """
-        resized_frames = [
-            cv2.resize(frame, (0, 0), fx=self.scale_factor, fy=self.scale_factor)
-            for frame in frames
-        ]
-        combined_image = np.hstack(resized_frames)
-        cv2.imshow('Combined Image', combined_image)
-        cv2.waitKey(delay)
+        now = time.monotonic()
+        if now - self._last_display_time < min_interval:
+            return
+        self._last_display_time = now
 
-    def log_capture_info(self, filenames, sample_index, timestamp):
+        # Resized straight into the camera's persistent display canvas
+        self.cameras.display_frames(frames, 'Combined Image', interpolation=cv2.INTER_AREA)
+        # Process the window events without blocking; keys are handled by execute_run
+        cv2.pollKey()
+
+    def log_capture_info(self, filenames, sample_index, timestamp, exposure_time=None):
         """
-        Log the capture info for each frame to a CSV file.
+        Log the capture info for each frame to the CSV buffer.
+        Rows are written to the file by flush_capture_log at the end of each run.
 
         Args:
             filenames (list of str): File paths of saved images.
             sample_index (int): Which sample was captured.
-            timestamp (datetime): Timestamp of the capture event.
+            timestamp (float): Unix time of the capture event.
+            exposure_time (int|float or None): Exposure time (µs) shared by all cameras.
+                If None, it is read from each camera.
         """
+        # All frames of one capture share the same timestamp
+        unix_timestamp = timestamp
+        datetime_str = datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M:%S.%f')
+
+        if exposure_time is None:
+            exposure_times = self.cameras.get_exposure_times()
+        else:
+            exposure_times = [exposure_time] * len(filenames)
+
         for idx, filename in enumerate(filenames):
-            camera_obj = self.cameras.cameras[idx]
             camera_id = idx
-            exposure_val = camera_obj.ExposureTime.GetValue()
-
-            unix_timestamp = timestamp.timestamp()
-            datetime_str = timestamp.astimezone().strftime('%Y-%m-%d %H:%M:%S.%f')
+            exposure_val = exposure_times[idx]
 
-            self.csv_writer.writerow([
+            self._csv_rows.append([
                 self.run_count,
                 sample_index,
                 camera_id,
@@ -404,22 +520,32 @@ class Experiment:
                 datetime_str,
                 filename
             ])
+
+    def flush_capture_log(self):
+        """
+        Write the buffered capture rows to the CSV file and flush it.
+        """
+        if not self._csv_rows:
+            return
+        self.csv_writer.writerows(self._csv_rows)
         self.csv_file.flush()
+        self._csv_rows.clear()
 
     def enter_break(self, delay=1, reinit_threshold=30):
         """
         Pause between runs for a specified break interval.
-        Optionally closes the cameras between runs based on configuration.
+        Optionally stops the cameras between runs based on configuration.
 
         Args:
             delay (int): Delay in seconds between each loop iteration during the break.
-            reinit_threshold (int): Time in seconds before the end of the break to reinitialize cameras.
+            reinit_threshold (int): Time in seconds before the end of the break to restart the cameras.
         """
         logger.info(f"Entering break period of {self.interval_minutes} minutes.")
 
         if self.turn_off_cameras_between_runs:
-            logger.info("Turning cameras off between runs as per configuration.")
-            self.cameras.close_cameras()
+            logger.info("Stopping cameras between runs as per configuration.")
+            # Devices stay open, so resuming does not need to reopen and reconfigure them
+            self.cameras.stop_grabbing()
         else:
             logger.info("Keeping cameras on during break as per configuration.")
 
@@ -451,12 +577,12 @@ class Experiment:
                     logger.info("Break time has ended. Proceeding to the next run.")
                     break
 
-                # Only reinitialize cameras if they were turned off
+                # Only restart cameras if they were stopped
                 if self.turn_off_cameras_between_runs and not cameras_reinitialized and remaining <= reinit_threshold:
                     logger.info(
                         f"Remaining break time ({remaining:.2f} seconds) is below the "
-                        f"reinitialization threshold of {reinit_threshold} seconds. "
-                        "Reinitializing cameras now."
+                        f"restart threshold of {reinit_threshold} seconds. "
+                        "Restarting cameras now."
                     )
                     self.reinitialize_cameras()
                     cameras_reinitialized = True
@@ -476,33 +602,27 @@ class Experiment:
 
     def reinitialize_cameras(self):
         """
-        Re-initialize cameras after the break, applying the chosen exposure mode again.
+        Restart grabbing after the break. The cameras were kept open, so their
+        size, buffer and exposure settings are still applied.
         """
-        logger.info("Re-initializing cameras after break.")
-        self.cameras.initialize_cameras()
-
-        if self.exposure_mode == 'Manual':
-            self.cameras.set_manual_exposure(self.exposure_time)
-            logger.info(f"Manual exposure reset to {self.exposure_time} µs.")
-        elif self.exposure_mode == 'Continuous':
-            self.cameras.set_auto_exposure('Continuous')
-            logger.info("Continuous auto-exposure re-enabled.")
-        # For 'SetOnce', exposures are handled at capture time
-
+        logger.info("Restarting cameras after break.")
         self.cameras.start_grabbing()
-        logger.info("Cameras re-initialized and started grabbing.")
+        logger.info("Cameras restarted grabbing.")
 
     def terminate_experiment(self):
         """
         Terminate the experiment gracefully. Generates a PDF report with results.
         """
-        end_time = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+        end_timestamp = time.time()
         total_samples = sum(self.visit_counts)
 
+        # Make sure all images are on disk before sizing the output folder
+        self.image_writer.wait()
+
         generate_pdf_report(
             self.config,
-            self.start_time,
-            end_time,
+            self.start_timestamp,
+            end_timestamp,
             self.run_count,
             total_samples,
             self.visit_counts,
@@ -518,7 +638,11 @@ class Experiment:
             self.arduino.close()
         if hasattr(self, 'cameras') and self.cameras:
             self.cameras.close_cameras()
+        if hasattr(self, 'image_writer') and self.image_writer:
+            self.image_writer.close()
         if hasattr(self, 'csv_file') and self.csv_file and not self.csv_file.closed:
+            # Rows of an interrupted run are still buffered
+            self.flush_capture_log()
             self.csv_file.close()
             logger.info("CSV file closed.")
         cv2.destroyAllWindows()
@@ -0,0 +1,132 @@
+import os
+import queue
+import threading
+import logging
+import tifffile
+
+logger = logging.getLogger(__name__)
+
+# Size of the file buffer used when writing an image (bytes)
+WRITE_BUFFER_SIZE = 4 * 1024 * 1024
+
+# tifffile keyword arguments for each supported TIFF compression
+TIFF_COMPRESSION_OPTIONS = {
+    None: {},
+    'zstd': {'compression': 'zstd', 'compressionargs': {'level': 3}, 'predictor': True},
+    'lzw': {'compression': 'lzw', 'predictor': True},
+    'deflate': {'compression': 'deflate', 'predictor': True},
+}
+
+class ImageWriter:
+    """
+    A background writer that encodes and saves captured frames as TIFF images
+    on a pool of worker threads, so the acquisition loop is not blocked by disk I/O.
+
+    Frames are handed to the workers through a bounded queue: if writing falls
+    behind, submit blocks instead of letting queued frames grow without limit.
+    """
+
+    def __init__(self, max_workers=None, compression=None, max_queue_size=32):
+        """
+        Initialize the writer threads.
+
+        Args:
+            max_workers (int or None): Number of writer threads. Defaults to the CPU count.
+            compression (str or None): TIFF compression, one of the keys of
+                TIFF_COMPRESSION_OPTIONS. None writes uncompressed TIFFs.
+            max_queue_size (int): Maximum number of frames waiting to be written.
+        """
+        if compression not in TIFF_COMPRESSION_OPTIONS:
+            raise ValueError(f"Unsupported TIFF compression: {compression}")
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.compression = compression
+        self.write_options = dict(TIFF_COMPRESSION_OPTIONS[compression])
+        if compression is not None:
+            # Tiled segments compress independently; frames are already
+            # parallelized across the pool, so keep one codec thread per write.
+            self.write_options.update(tile=(256, 256), maxworkers=1)
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.workers = [
+            threading.Thread(target=self._worker, name=f"ImageWriter-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for worker in self.workers:
+            worker.start()
+
+    def submit(self, filepath, frame, on_done=None):
+        """
+        Queue a frame to be written to disk. Blocks while the queue is full.
+
+        The frame must not be modified by the caller after submission.
+
+        Args:
+            filepath (str): Destination path of the TIFF file.
+            frame (np.ndarray): Image data to save.
+            on_done (callable or None): Called with the frame once it has been
+                written (or failed to write), e.g. to recycle the buffer.
+        """
+        self.queue.put((filepath, frame, on_done))
+
+    def _worker(self):
+        """
+        Worker thread loop: write queued frames until a None sentinel is received.
+        """
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self._write(*item)
+            except Exception as e:
+                logger.error(f"Failed to save image {item[0]}: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _write(self, filepath, frame, on_done=None):
+        """
+        Encode and write a single frame. Runs on a worker thread.
+        """
+        try:
+            if self.compression is None:
+                self._write_memmap(filepath, frame)
+            else:
+                # A large write buffer coalesces tifffile's small header/tile
+                # writes into a few big write() calls
+                with open(filepath, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                    tifffile.imwrite(f, frame, **self.write_options)
+        finally:
+            if on_done is not None:
+                on_done(frame)
+        return filepath
+
+    def _write_memmap(self, filepath, frame):
+        """
+        Write an uncompressed TIFF by copying the frame straight into a
+        memory-mapped file, avoiding an intermediate copy through write().
+        """
+        image = tifffile.memmap(filepath, shape=frame.shape, dtype=frame.dtype)
+        try:
+            image[:] = frame
+        finally:
+            # Unmapping leaves the dirty pages to the OS page cache; no per-frame
+            # msync, so the write does not wait for the disk
+            del image
+
+    def wait(self):
+        """
+        Block until all queued frames have been written.
+        """
+        self.queue.join()
+
+    def close(self):
+        """
+        Write all outstanding frames and stop the writer threads.
+        """
+        if not self.workers:
+            return
+        for _ in self.workers:
+            self.queue.put(None)
+        for worker in self.workers:
+            worker.join()
+        self.workers = []
+        logger.info("Image writer closed.")
@@ -1,16 +1,42 @@
 import json
 import os
 import logging
-from datetime import datetime
+import time
+from datetime import timedelta
 from reportlab.lib.pagesizes import letter
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle
 )
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib import colors
+from src.ImageWriter import TIFF_COMPRESSION_OPTIONS
 
 logger = logging.getLogger(__name__)
 
+# Report styles are built once and shared by every report
+_STYLES = getSampleStyleSheet()
+_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#f2f2f2")),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+])
+
+def format_timestamp(timestamp):
+    """
+    Format a Unix timestamp as local time for folder and report names.
+
+    Args:
+        timestamp (float): Unix timestamp, e.g. from time.time().
+
+    Returns:
+        str: The timestamp formatted as 'YYYY-MM-DD_HH-MM-SS'.
+    """
+    return time.strftime('%Y-%m-%d_%H-%M-%S', time.localtime(timestamp))
+
 def load_config(config_file="config.json"):
     """
     Load configuration settings from a JSON file with error handling
@@ -86,6 +112,23 @@ def validate_config(config):
             )
             raise ValueError(f"Camera setting '{key}' must be one of types {expected_names}")
 
+    # Validate optional grab buffer settings
+    max_num_buffer = camera_settings.get('max_num_buffer', 20)
+    if not isinstance(max_num_buffer, int) or max_num_buffer <= 0:
+        raise ValueError("'max_num_buffer' in camera_settings must be a positive integer")
+    max_transfer_size = camera_settings.get('max_transfer_size')
+    if max_transfer_size is not None and (not isinstance(max_transfer_size, int) or max_transfer_size <= 0):
+        raise ValueError("'max_transfer_size' in camera_settings must be a positive integer or null")
+    gev_packet_size = camera_settings.get('gev_packet_size')
+    if gev_packet_size is not None and (not isinstance(gev_packet_size, int) or gev_packet_size <= 0):
+        raise ValueError("'gev_packet_size' in camera_settings must be a positive integer or null")
+    gev_inter_packet_delay = camera_settings.get('gev_inter_packet_delay')
+    if gev_inter_packet_delay is not None and (not isinstance(gev_inter_packet_delay, int) or gev_inter_packet_delay < 0):
+        raise ValueError("'gev_inter_packet_delay' in camera_settings must be a non-negative integer or null")
+    pixel_format = camera_settings.get('pixel_format', 'Mono8')
+    if pixel_format is not None and not isinstance(pixel_format, str):
+        raise ValueError("'pixel_format' in camera_settings must be a string or null")
+
     # Validate 'exposure_mode' if present
     exposure_mode = camera_settings.get('exposure_mode', 'Manual')
     if exposure_mode not in ['Manual', 'SetOnce', 'Continuous']:
@@ -127,6 +170,14 @@ def validate_config(config):
     # Validate optional Arduino settings
     if not isinstance(arduino_settings.get('auto_detect_port', False), bool):
         raise ValueError("'auto_detect_port' in arduino_settings must be a bool")
+    if not isinstance(arduino_settings.get('use_first_detected_port', True), bool):
+        raise ValueError("'use_first_detected_port' in arduino_settings must be a bool")
+    capture_ack_timeout = arduino_settings.get('capture_ack_timeout', 10)
+    if not isinstance(capture_ack_timeout, (int, float)) or capture_ack_timeout < 0:
+        raise ValueError("'capture_ack_timeout' in arduino_settings must be a non-negative number")
+    capture_complete_pulse_ms = arduino_settings.get('capture_complete_pulse_ms', 50)
+    if not isinstance(capture_complete_pulse_ms, (int, float)) or capture_complete_pulse_ms < 0:
+        raise ValueError("'capture_complete_pulse_ms' in arduino_settings must be a non-negative number")
 
     # If 'auto_detect_port' is False, ensure 'port' is provided and valid
     if not arduino_settings.get('auto_detect_port', False):
@@ -155,6 +206,15 @@ def validate_config(config):
     if not isinstance(config.get('display_images', True), bool):
         raise ValueError("'display_images' must be a bool")
 
+    # Validate 'profile_runs'
+    if not isinstance(config.get('profile_runs', False), bool):
+        raise ValueError("'profile_runs' must be a bool")
+
+    # Validate 'tiff_compression'
+    if config.get('tiff_compression') not in TIFF_COMPRESSION_OPTIONS:
+        allowed = ', '.join('null' if name is None else f"'{name}'" for name in TIFF_COMPRESSION_OPTIONS)
+        raise ValueError(f"'tiff_compression' must be one of: {allowed}")
+
 def generate_pdf_report(
     config, start_time, end_time,
     run_count, total_samples_collected,
@@ -162,32 +222,25 @@ def generate_pdf_report(
 ):
     """
     Generate a comprehensive PDF report with experiment details.
+
+    Args:
+        start_time (float): Unix timestamp of the experiment start.
+        end_time (float): Unix timestamp of the experiment end.
     """
-    pdf_filename = os.path.join(output_folder, f'{start_time}_report.pdf')
-    logger.info(f"Generating PDF report: {pdf_filename}")
+    # Times are carried as Unix timestamps and only formatted here
+    start_time_str = format_timestamp(start_time)
+    end_time_str = format_timestamp(end_time)
+    total_duration_str = str(timedelta(seconds=int(end_time - start_time)))
 
-    # Convert start/end times
-    start_datetime = datetime.strptime(start_time, '%Y-%m-%d_%H-%M-%S')
-    end_datetime = datetime.strptime(end_time, '%Y-%m-%d_%H-%M-%S')
-    total_duration = end_datetime - start_datetime
-    total_duration_str = str(total_duration)
+    pdf_filename = os.path.join(output_folder, f'{start_time_str}_report.pdf')
+    logger.info(f"Generating PDF report: {pdf_filename}")
 
     total_filesize_mb = get_folder_size(output_folder) / (1024 * 1024)
 
     doc = SimpleDocTemplate(pdf_filename, pagesize=letter)
-    styles = getSampleStyleSheet()
-    heading_style = styles["Heading1"]
-    subheading_style = styles["Heading2"]
-
-    table_style = TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#f2f2f2")),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, -1), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
-        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-    ])
+    heading_style = _STYLES["Heading1"]
+    subheading_style = _STYLES["Heading2"]
+    table_style = _TABLE_STYLE
 
     content = []
     content.append(Paragraph("Experiment Report", heading_style))
@@ -197,8 +250,8 @@ def generate_pdf_report(
     content.append(Paragraph("Experiment Details", subheading_style))
     experiment_info = [
         ["Experiment Name", config.get('experiment_name', 'N/A')],
-        ["Start Time", start_time],
-        ["End Time", end_time],
+        ["Start Time", start_time_str],
+        ["End Time", end_time_str],
         ["Total Duration", total_duration_str],
         ["Total Runs Performed", str(run_count)],
         ["Interval Between Runs (minutes)", str(config.get('interval_minutes', 'N/A'))],
@@ -245,10 +298,11 @@ def generate_pdf_report(
 
     # Visit counts per sample
     content.append(Paragraph("Visit Counts per Sample", subheading_style))
-    visit_info = [["Sample Index", "Visit Count"]]
-    for i, count in enumerate(visit_counts):
-        visit_info.append([str(i), str(count)])
-    visit_table = Table(visit_info, colWidths=[200, 350])
+    visit_info = [["Sample Index", "Visit Count"]] + [
+        [str(i), str(count)] for i, count in enumerate(visit_counts)
+    ]
+    # LongTable lays out long tables faster and repeats the header on each page
+    visit_table = LongTable(visit_info, colWidths=[200, 350], repeatRows=1)
     visit_table.setStyle(table_style)
     content.append(visit_table)
     content.append(Spacer(1, 12))
@@ -262,11 +316,16 @@ def generate_pdf_report(
 def get_folder_size(folder_path):
     """
     Compute the total size of files in a given folder, recursively.
+    Uses os.scandir so file types and sizes come from the directory
+    listing instead of separate stat calls per file.
     """
     total_size = 0
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            fp = os.path.join(root, file)
-            if os.path.isfile(fp):
-                total_size += os.path.getsize(fp)
+    stack = [folder_path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    total_size += entry.stat(follow_symlinks=False).st_size
+                elif entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
     return total_size
\ No newline at end of file
@@ -0,0 +1,70 @@
+import inspect
+
+import pyfirmata
+import pytest
+from pyfirmata import pyfirmata as firmata_board
+
+from src import Arduino
+from src.Arduino import ArduinoController
+
+
+class FakeSerial:
+    """Stands in for the board's serial port: accepts writes, never reports data."""
+
+    def __init__(self, *args, **kwargs):
+        self.written = bytearray()
+
+    def write(self, data):
+        self.written.extend(data)
+
+    def read(self, size=1):
+        return b''
+
+    def inWaiting(self):
+        return 0
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def fake_board(monkeypatch):
+    monkeypatch.setattr(firmata_board.serial, 'Serial', FakeSerial)
+    monkeypatch.setattr(firmata_board, 'BOARD_SETUP_WAIT_TIME', 0)
+    monkeypatch.setattr(Arduino, '_BOARD_POOL', {})
+    if not hasattr(inspect, 'getargspec'):
+        # pyFirmata 1.1.0 still uses getargspec, removed in Python 3.11
+        monkeypatch.setattr(inspect, 'getargspec', inspect.getfullargspec, raising=False)
+
+
+def test_controllers_share_input_pin(fake_board):
+    """Two controllers on one port can both watch the same input pin."""
+    first = ArduinoController('/dev/fake0')
+    second = ArduinoController('/dev/fake0')
+    try:
+        assert first.board is second.board
+        first.setup_digital_input(6)
+        second.setup_digital_input(6)
+        assert first.input_pins[6] is second.input_pins[6]
+
+        # Pin 6 going high on port 0, as parsed by the iterator thread
+        first._shared._handle_digital_message(0, 1 << 6, 0)
+        assert first.wait_rising_edge(6, timeout=0)
+        assert second.wait_rising_edge(6, timeout=0)
+    finally:
+        first.close()
+        second.close()
+
+
+def test_shared_pin_in_other_mode_is_refused(fake_board):
+    """A pin used as an output by one controller is not handed out as an input."""
+    first = ArduinoController('/dev/fake0')
+    second = ArduinoController('/dev/fake0')
+    try:
+        first.setup_digital_output(2)
+        second.setup_digital_input(2)
+        assert 2 not in second.input_pins
+        assert first.board.digital[2].mode == pyfirmata.OUTPUT
+    finally:
+        first.close()
+        second.close()
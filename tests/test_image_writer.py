@@ -0,0 +1,23 @@
+import numpy as np
+import pytest
+import tifffile
+
+from src.ImageWriter import ImageWriter, TIFF_COMPRESSION_OPTIONS
+
+
+@pytest.mark.parametrize("compression", list(TIFF_COMPRESSION_OPTIONS))
+def test_round_trip(tmp_path, compression):
+    """Every supported compression writes a frame that reads back unchanged."""
+    frame = np.random.default_rng(0).integers(0, 256, size=(300, 520), dtype=np.uint8)
+    filepath = str(tmp_path / "frame.tiff")
+    done = []
+
+    writer = ImageWriter(max_workers=1, compression=compression)
+    try:
+        writer.submit(filepath, frame, on_done=done.append)
+        writer.wait()
+    finally:
+        writer.close()
+
+    assert len(done) == 1
+    np.testing.assert_array_equal(tifffile.imread(filepath), frame)